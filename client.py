@@ -1,69 +1,133 @@
-import socket
 import asyncio
 from collections import Counter
 import re
+import unicodedata
 import logging
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Accepted chunk_size range, reads grow from chunk_size up to MAX_CHUNK_SIZE while they come back full
+MIN_CHUNK_SIZE = 64
+MAX_CHUNK_SIZE = 256 * 1024
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Validation messages built once at import, not on each check
+_PORT_ERROR = "Port must be in range 1-65535"
+_CHUNK_SIZE_ERROR = f"chunk_size must be in range {MIN_CHUNK_SIZE}-{MAX_CHUNK_SIZE}"
+
+# Compiled once at import, process_text_chunk runs on every received chunk
+# \w matches [a-zA-Z0-9_] plus Unicode letter categories (includes accented letters)
+# Greedy \w+ already stops at word boundaries, explicit \b assertions only cost extra checks per match
+_WORD_RE = re.compile(r"\w+")
+# Texts shorter than this (tails, tiny files) try a str.split fast path before the regex
+_SMALL_TEXT_SIZE = 64
+# Received text is tokenized in windows of at least this many bytes rather than once per recv
+_WINDOW_SIZE = 256 * 1024
+# Windows shipped to worker processes are larger, so pickling and IPC stay small next to tokenizing
+_POOL_WINDOW_SIZE = 1024 * 1024
+
+def _fold(text: str):
+    """
+    Casefold text and normalize the result to NFC, so canonically equal words land in one count
+    Args: text (str): text to fold
+    Returns: str: folded text
+    """
+    # casefold first: it can emit decomposed sequences (e.g. 'ΐ', 'ǰ') that \w+ would split at the combining mark,
+    # NFC afterwards recomposes them; normalize returns already-NFC text unchanged after a quick check
+    return unicodedata.normalize("NFC", text.casefold())
+
+def _count_words(text: str):
+    """
+    Count words in a text window, module level so worker processes can run it
+    Args: text (str): text window to process
+    Returns: Counter of words (Counter)
+    """
+    return Counter(_WORD_RE.findall(_fold(text)))
 
 class TxtClient:    
-    async def read_from_server(self, addr: str, port: int, chunk_size: int):
+    def __init__(self, workers: int = None):
+        """
+        Args: workers (int): worker processes used by run_analysis to tokenize large transfers
+                             (default: os.cpu_count(), or 0 on a single CPU; 0 tokenizes on the event loop thread)
+        """
+        if workers is None:
+            # cpu_count() may be None; with one CPU a pool only adds pickling and IPC to the same work
+            workers = os.cpu_count() or 1
+            if workers <= 1:
+                workers = 0
+        self.workers = workers
+
+    async def read_from_server(self, addr: str, port: int, chunk_size: int, pool: ProcessPoolExecutor = None):
         """
         Read text data from server and count word occurrences
         Args: addr (str): server address (e.g. 'localhost' or '0.0.0.0')
               port (int): server port (e.g. 1024-65535)
-              chunk_size (int): size of data chunks to read (e.g. 64-8192)
+              chunk_size (int): initial size of data chunks to read (e.g. 64-262144)
+              pool (ProcessPoolExecutor): pool to tokenize full windows in (default: None, tokenize inline)
         Returns: Counter of words  (Counter)
         """
-        if port < 1 or port > 65535:
-            logging.error("Error: Port must be in range 1-65535")
-            raise ValueError("Port must be in range 1-65535")
-        elif chunk_size < 64 or chunk_size > 8192:
-            logging.error("Error: chunk_size must be in range 64-8192")
-            raise ValueError("chunk_size must be in range 64-8192")
+        if not 1 <= port <= 65535:
+            logging.error("Error: %s", _PORT_ERROR)
+            raise ValueError(_PORT_ERROR)
+        elif not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+            logging.error("Error: %s", _CHUNK_SIZE_ERROR)
+            raise ValueError(_CHUNK_SIZE_ERROR)
 
-        client_socket = None
+        writer = None
         word_counter = Counter()  # Counter to aggregate word counts
-        text_buffer = ""
+        window = bytearray()  # Received bytes waiting to be decoded and tokenized together
+        searched = 0  # Size of window at the last split attempt
+        window_limit = _WINDOW_SIZE if pool is None else _POOL_WINDOW_SIZE
+        partial_counts = []  # Futures of windows tokenized in worker processes
         try:
-            client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)  # Create TCP socket
-            client_socket.connect((addr, port))  # Connect to server
+            loop = asyncio.get_running_loop()
+            # asyncio streams resolve addr for IPv4 or IPv6 and set TCP_NODELAY, the transport reads whenever
+            # data is ready so reads from several servers interleave on the event loop
+            # SO_RCVBUF is left unset on purpose: a fixed size turns off Linux receive buffer autotuning
+            # limit lets the stream buffer hold a full MAX_CHUNK_SIZE read before pausing the transport
+            reader, writer = await asyncio.open_connection(addr, port, limit=MAX_CHUNK_SIZE)
 
             # Receive file size first, sockets need to know expected size before transfer
-            size_data = b""
-            while True:
-                char = client_socket.recv(1)
-                if char == b"\n":
-                    break
-                size_data += char
-  
-            file_size = int(size_data.decode())
+            file_size = int(await reader.readuntil(b"\n"))
             logging.info(f"{addr}:{port}: Expected {file_size} bytes")
 
             # Stream and process data in chunks with a buffer
             total_received = 0
+            read_size = chunk_size
             while total_received < file_size:
-                chunk = client_socket.recv(min(chunk_size, file_size - total_received))
+                chunk = await reader.read(min(read_size, file_size - total_received))
                 if not chunk:
                     break
-
                 total_received += len(chunk)
-                # decoding and adding to a buffer
-                try:
-                    text_chunk = chunk.decode("utf-8")
-                except UnicodeDecodeError:
-                    # Handle partial UTF-8 characters at chunk boundaries
-                    text_chunk = chunk.decode("utf-8", errors="replace")
-                text_buffer += text_chunk
+                window += chunk
+
+                # A full read means more data is already buffered, so ask for twice as much next time
+                if len(chunk) == read_size and read_size < MAX_CHUNK_SIZE:
+                    read_size = min(read_size * 2, MAX_CHUNK_SIZE)
 
-                # process complete words from buffer
-                word_counter.update(self.process_buffer(text_buffer))
-                # Keep incomplete word at end of buffer
-                text_buffer = self.get_incomplete_word(text_buffer)
+                # Decode and tokenize once per window, amortizing decode, regex and Counter overhead over many chunks
+                # Waiting for window_limit new bytes also keeps text without whitespace from being rescanned per chunk
+                if len(window) - searched >= window_limit:
+                    # Split once at the last boundary: count complete words, keep incomplete word for the next window
+                    complete_bytes, incomplete_word = self.split_at_last_boundary(window)
+                    if complete_bytes:
+                        # ASCII whitespace bytes never occur inside a multi-byte UTF-8 sequence,
+                        # so decoding up to a boundary never splits a character
+                        complete_text = complete_bytes.decode("utf-8", errors="replace")
+                        del window[:len(window) - len(incomplete_word)]
+                        if pool is None:
+                            self.process_text_chunk(complete_text, word_counter)
+                        else:
+                            # Tokenizing is CPU bound, workers run it outside the GIL while this task keeps reading
+                            partial_counts.append(loop.run_in_executor(pool, _count_words, complete_text))
+                    searched = len(window)
 
             # Process any remaining text in buffer
+            text_buffer = window.decode("utf-8", errors="replace")
             if text_buffer.strip():
-                word_counter.update(self.process_text_chunk(text_buffer))
+                self.process_text_chunk(text_buffer, word_counter)
+            for partial_count in await asyncio.gather(*partial_counts):
+                word_counter.update(partial_count)
             logging.info(f"{addr}:{port}: {total_received} bytes processed")
             return word_counter
         
@@ -72,8 +136,28 @@ class TxtClient:
             logging.error(f"Error reading from {addr}:{port}: {e}")
             return Counter()
         finally:
-            if client_socket:
-                client_socket.close()
+            if writer:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except ConnectionError:
+                    pass  # Connection already gone, nothing left to clean up
+
+    def split_at_last_boundary(self, buffer):
+        """
+        Split buffer at its last word boundary (any whitespace)
+        Args: buffer (str, bytes or bytearray): text buffer to split
+        Returns: tuple: complete text before the boundary and incomplete word after it
+        """
+        if buffer[-1:].isspace():
+            return buffer, buffer[:0]  # Buffer ends on a boundary, no incomplete word
+
+        # rsplit scans back from the end once and stops at the first whitespace of any kind
+        parts = buffer.rsplit(None, 1)
+        if len(parts) < 2:
+            return buffer[:0], parts[0] if parts else buffer  # Entire buffer is incomplete word
+
+        return parts[0], parts[1]
 
     def process_buffer(self, buffer: str):
         """
@@ -81,16 +165,7 @@ class TxtClient:
         Args: buffer (str): text buffer to process
         Returns: Counter of words (Counter)
         """
-        # Find last complete word boundary
-        last_space = buffer.rfind(' ')
-        last_newline = buffer.rfind('\n')
-        last_boundary = max(last_space, last_newline)
-        
-        if last_boundary == -1:
-            return Counter()  # No complete words
-        
-        # Process text up to last word boundary
-        complete_text = buffer[:last_boundary]
+        complete_text, _ = self.split_at_last_boundary(buffer)
         return self.process_text_chunk(complete_text)
 
     def get_incomplete_word(self, buffer: str):
@@ -99,44 +174,57 @@ class TxtClient:
         Args: buffer (str): text buffer
         Returns: str: incomplete word at end of buffer
         """
-        last_space = buffer.rfind(' ')
-        last_newline = buffer.rfind('\n')
-        last_boundary = max(last_space, last_newline)
-        
-        if last_boundary == -1:
-            return buffer  # Entire buffer is incomplete word
-        
-        return buffer[last_boundary + 1:]
+        _, incomplete_word = self.split_at_last_boundary(buffer)
+        return incomplete_word
 
-    def process_text_chunk(self, text: str):
+    def process_text_chunk(self, text: str, counter: Counter = None):
         """
         Process a chunk of text and return word counter.
         Args: text (str): text chunk to process
+              counter (Counter): optional counter to add the words to in place instead of building a new one
         Returns: Counter of words (Counter)
         """
+        if counter is None:
+            counter = Counter()
+
         # Process a chunk of text and return word counter
         if not text:
-            return Counter()
+            return counter
         
-        # Convert to lowercase and extract words to count them
-        # Use \w+ to match Unicode word characters (includes accented letters)
-        # \w matches [a-zA-Z0-9_] plus Unicode letter categories
-        words = re.findall(r"\b\w+\b", text.lower())
-        return Counter(words)
+        # Fold case and NFC-normalize (so 'cafe\u0301' and 'café' match), then extract words to count them
+        lowered = _fold(text)
+        if len(lowered) < _SMALL_TEXT_SIZE:
+            # \w is exactly str.isalnum plus '_', so when every whitespace-separated piece is alphanumeric
+            # split() yields the same words as the regex for less setup
+            words = lowered.split()
+            if not words:
+                return counter
+            if "".join(words).isalnum():
+                counter.update(words)
+                return counter
+        counter.update(_WORD_RE.findall(lowered))
+        return counter
 
     async def run_analysis(self, servers: list[tuple[str, int, int]]):
         """
         Run analysis on multiple servers in parallel using async.
-        Args: servers (list): List of tuples (addr, port, chunk_size, e.g. ('localhost', 9001, 8192)).
+        Args: servers (list): List of tuples (addr, port, chunk_size, e.g. ('localhost', 9001, 65536)).
         Returns: list: List of results from each server, in the same order as the input tasks.
         """
-        # Start connections in parallel
-        tasks = []
-        for addr, port, chunk_size in servers:
-            tasks.append(asyncio.create_task(self.read_from_server(addr, port, chunk_size)))
+        # Worker processes are only spawned once a transfer fills a window
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 0 else None
+        try:
+            # Start connections in parallel
+            tasks = []
+            for addr, port, chunk_size in servers:
+                tasks.append(asyncio.create_task(self.read_from_server(addr, port, chunk_size, pool)))
 
-        # Wait for all tasks to complete
-        return await asyncio.gather(*tasks)
+            # Wait for all tasks to complete
+            return await asyncio.gather(*tasks)
+        finally:
+            if pool is not None:
+                # shutdown joins the worker processes, run it in a thread so the event loop is not blocked
+                await asyncio.to_thread(pool.shutdown)
     
     def aggregate_results(self, results: list[Counter]):
         """
@@ -144,9 +232,16 @@ class TxtClient:
         Args: results (list): List of Counter objects from each server.
         Returns: Counter: Aggregated word counts.
         """
-        aggregation_counter = Counter()
-        for result in results:
-            aggregation_counter.update(result)
+        if not results:
+            return Counter()
+
+        # Copying into an empty Counter is a C-level dict update, only the smaller results go through the merge loop
+        # Skipped by index, not identity, so the same Counter passed twice is still counted twice
+        largest = max(range(len(results)), key=lambda i: len(results[i]))
+        aggregation_counter = Counter(results[largest])
+        for i, result in enumerate(results):
+            if i != largest:
+                aggregation_counter.update(result)
         return aggregation_counter
 
     def print_results(self, aggregation_counter: Counter, num_servers: int):
@@ -155,6 +250,7 @@ class TxtClient:
         Args: aggregation_counter (Counter): Aggregated word counts.
               num_servers (int): Number of servers processed.
         """
+        # most_common(n) selects with heapq.nlargest, no full sort over every unique word
         print(f"Top 5 words across {num_servers} file{'s' if num_servers != 1 else ''}:")
         for word, count in aggregation_counter.most_common(5):
             print(f"  {word}: {count}")
@@ -163,7 +259,7 @@ async def main(servers: list[tuple[str, int, int]] = None):
 
     if servers is None:
         logging.info("No servers provided, using default localhost servers.")
-        servers = [("localhost", 9001, 8192), ("localhost", 9002, 8192)]  # Default servers
+        servers = [("localhost", 9001, DEFAULT_CHUNK_SIZE), ("localhost", 9002, DEFAULT_CHUNK_SIZE)]  # Default servers
 
     # Create client instance
     client = TxtClient()
@@ -1,95 +1,278 @@
-import socket # For TCP socket operations used previously, replaced by asyncio streams
+import socket # For socket options, connections themselves go through asyncio streams
 import os
 import sys
 import asyncio 
 import logging
+import logging.handlers
+import multiprocessing
+import queue
+import signal
+import atexit
+
+try:
+    import uvloop # Optional libuv-based event loop, socket operations run in C
+except ImportError:
+    uvloop = None
+
+# Accepted chunk_size range
+MIN_CHUNK_SIZE = 64
+MAX_CHUNK_SIZE = 256 * 1024
+# Validation messages built once at import, not on each check
+_PORT_ERROR = "Port must be in range 1-65535"
+_CHUNK_SIZE_ERROR = f"chunk_size must be in range {MIN_CHUNK_SIZE}-{MAX_CHUNK_SIZE}"
+# Bytes read from disk per worker-thread call in the chunked send fallback, sent on in chunk_size pieces
+FALLBACK_BLOCK_SIZE = 1024 * 1024
+# Pending connections the kernel queues before refusing new ones under burst load
+SOCKET_LISTEN_BACKLOG = 1024
+
+# Logging state per process: forked workers inherit these values but not the listener thread itself
+_LOG_LISTENERS: dict[int, logging.handlers.QueueListener] = {}
+_LOGS_DIR_CREATED = False
+
+def configure_logging():
+    """
+    Log to logs/server.log and the console from a background thread, so log calls never block the event loop on I/O
+    Returns: QueueListener: running listener, stop it to flush pending records
+    """
+    global _LOGS_DIR_CREATED
+    # Already configured in this process, a second listener would only duplicate every record
+    # A stopped listener (its _thread is cleared by stop()) no longer drains the queue, so it is replaced
+    listener = _LOG_LISTENERS.get(os.getpid())
+    if listener is not None and listener._thread is not None:
+        return listener
+
+    # Ensure 'logs/' directory exists, once per process tree
+    if not _LOGS_DIR_CREATED:
+        os.makedirs("logs", exist_ok=True)
+        _LOGS_DIR_CREATED = True
+    # Setup logging to file and console, the file is only opened once the first record arrives
+    file_handler = logging.FileHandler("logs/server.log", mode="a", delay=True)
+    file_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    console_handler = logging.StreamHandler(sys.stdout) # Also logs to console
+
+    # Log calls only enqueue the record, the listener thread does the writing
+    log_queue = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler)
+    listener.start()
+    _LOG_LISTENERS[os.getpid()] = listener
+    return listener
+
+def prefer_uvloop(file_path: str, chunk_size: int):
+    """
+    Decide whether to serve on uvloop, which has no loop.sendfile: files larger than one chunk would lose
+    the zero-copy send on it and go through the much slower chunked fallback
+    Args: file_path (str): path to the text file to send
+          chunk_size (int): size of data chunks to send
+    Returns: bool: True when uvloop is installed and the whole file goes out in a single write
+    """
+    return uvloop is not None and os.path.isfile(file_path) and os.path.getsize(file_path) <= chunk_size
+
+def run_event_loop(coro, use_uvloop: bool = False):
+    """
+    Run a coroutine to completion on uvloop or on the default asyncio loop
+    Args: coro (coroutine): coroutine to run
+          use_uvloop (bool): run on uvloop if it is installed (default: False, see prefer_uvloop)
+    Returns: result of the coroutine
+    """
+    if use_uvloop and uvloop is not None:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
+
+def run_server(host: str, port: int, chunk_size: int, file_path: str, reuse_port: bool = False):
+    """
+    Run a TxtServer until it stops, module level so worker processes can use it as their target
+    Args: host (str): server host
+          port (int): server port
+          chunk_size (int): size of data chunks to send
+          file_path (str): path to the text file to send
+          reuse_port (bool): share the port with other workers through SO_REUSEPORT (default: False)
+    Returns: None
+    """
+    # Listener threads do not survive into worker processes, each worker starts its own
+    listener = configure_logging()
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0)) # Exit cleanly so the listener is flushed
+    try:
+        run_event_loop(TxtServer().startup_server(host, port, chunk_size, file_path, reuse_port),
+                       prefer_uvloop(file_path, chunk_size))
+    finally:
+        listener.stop()
 
 class TxtServer:
-    async def startup_server(self, host: str, port: int, chunk_size: int, file_path: str):
+    async def startup_server(self, host: str, port: int, chunk_size: int, file_path: str, reuse_port: bool = False):
         """
         Starts a socket server using asyncio streams
         Args: host (str): server host ('' or '0.0.0.0' for all interfaces)
               port (int): server port (e.g. 1024-65535)
-              chunk_size (int): size of data chunks to send (e.g. 64-8192)
+              chunk_size (int): size of data chunks to send (e.g. 64-262144)
               file_path (str): path to the text file to send (e.g. 'data/frankenstein.txt')
+              reuse_port (bool): share the port with other workers through SO_REUSEPORT (default: False)
         Returns: None
         """
-        if port < 1 or port > 65535:
-            logging.error("Error: Port must be in range 1-65535")
-            raise ValueError("Port must be in range 1-65535")
-        elif chunk_size < 64 or chunk_size > 8192:
-            logging.error("Error: chunk_size must be in range 64-8192")
-            raise ValueError("chunk_size must be in range 64-8192")
-        elif not os.path.exists(file_path):
-            logging.error(f"Error: File '{file_path}' not found")
+        if not 1 <= port <= 65535:
+            logging.error("Error: %s", _PORT_ERROR)
+            raise ValueError(_PORT_ERROR)
+        elif not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+            logging.error("Error: %s", _CHUNK_SIZE_ERROR)
+            raise ValueError(_CHUNK_SIZE_ERROR)
+        elif not os.path.isfile(file_path):
+            logging.error("Error: File '%s' not found", file_path)
             raise ValueError(f"File '{file_path}' not found")
 
+        # The served file is fixed for the server's lifetime, stat it once instead of once per connection
+        file_size = os.path.getsize(file_path)
+        header = f"{file_size}\n".encode("ascii")  # Same size line for every client, encode it once
+        # Files that fit in one chunk are kept in memory, connections then never wait on the disk
+        file_data = None
+        if file_size <= chunk_size:
+            with open(file_path, "rb") as f:
+                file_data = f.read(file_size)
+
+        # SO_REUSEPORT lets several server processes accept on the same port, the kernel balances connections
+        # Only run_workers asks for it, a lone server keeps an exclusive port so a second one fails to bind
         server = await asyncio.start_server(
-            lambda r, w: self.handle_client(r, w, file_path, chunk_size),
-            host, port
+            lambda r, w: self.handle_client(r, w, file_path, chunk_size, file_size, file_data, header),
+            host, port, backlog=SOCKET_LISTEN_BACKLOG, reuse_port=reuse_port
         )
-        logging.info(f"Server started on {host}:{port}, serving file '{file_path}' in chunks of {chunk_size} bytes")
+        logging.info("Server started on %s:%d, serving file '%s' in chunks of %d bytes", host, port, file_path, chunk_size)
         try:
             await server.serve_forever()
         except KeyboardInterrupt:
-            logging.info(f"\nServer on port {port} shutting down...")
+            logging.info("\nServer on port %d shutting down...", port)
         finally:
             server.close()
             await server.wait_closed()
 
-    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, file_path: str, chunk_size: int):
+    def run_workers(self, host: str, port: int, chunk_size: int, file_path: str, workers: int):
         """
-        Handle a client connection, sending the file in chunks
+        Run the server in several processes accepting on the same port, the kernel spreads connections over them
+        Args: host (str): server host
+              port (int): server port, shared by all workers through SO_REUSEPORT
+              chunk_size (int): size of data chunks to send
+              file_path (str): path to the text file to send
+              workers (int): number of server processes (e.g. os.cpu_count())
+        Returns: int: exit code, 0 when every worker stopped cleanly
+        """
+        if not hasattr(socket, "SO_REUSEPORT"):
+            logging.error("Error: Multiple workers need SO_REUSEPORT, which this platform does not support")
+            return 1
+
+        # Spawn rather than fork: the parent already runs the logging listener thread, and a child forked
+        # from a multithreaded process can deadlock on a lock that thread held at fork time
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(target=run_server, args=(host, port, chunk_size, file_path, True), daemon=True)
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        logging.info("Started %d server workers on %s:%d", workers, host, port)
+
+        try:
+            for process in processes:
+                process.join()
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+        return 1 if any(process.exitcode for process in processes) else 0
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, file_path: str, chunk_size: int, file_size: int = None, file_data: bytes = None, header: bytes = None):
+        """
+        Handle a client connection, sending the file with sendfile or in chunks
         Args: reader (StreamReader): asyncio stream reader
               writer (StreamWriter): asyncio stream writer
               file_path (str): path to the text file to send
-              chunk_size (int): size of data chunks to send
+              chunk_size (int): size of data chunks to send when sendfile is not available
+              file_size (int): size of the file, measured at startup (default: stat file_path now)
+              file_data (bytes): content of a file no larger than chunk_size, loaded at startup (default: read it now)
+              header (bytes): encoded file size line, built at startup (default: build it now)
         Returns: None
         """
         try:
             # Send file size first
-            file_size = os.path.getsize(file_path)
-            writer.write(f"{file_size}\n".encode())
-            await writer.drain()
+            if file_size is None:
+                file_size = os.path.getsize(file_path)
+            if header is None:
+                header = f"{file_size}\n".encode("ascii")
 
-            # Stream file content in chunks
-            with open(file_path, "rb") as f:
-                while True:
-                    chunk = f.read(chunk_size)
-                    if not chunk:
-                        break
-                    writer.write(chunk)
-                    await writer.drain()
-            logging.info(f"Server sent {file_size} bytes to {writer.get_extra_info('peername')}")
+            # asyncio already sets TCP_NODELAY, TCP_CORK holds partial segments so header and body fill full packets
+            client_socket = writer.get_extra_info("socket")
+            if hasattr(socket, "TCP_CORK"):  # Linux only
+                client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 1)
+
+            if file_size <= chunk_size:
+                if file_data is None:
+                    with open(file_path, "rb") as f:
+                        file_data = f.read(file_size)
+                # Small file: header and content leave in a single write instead of one per part
+                writer.writelines([header, file_data])
+                await writer.drain()
+            else:
+                loop = asyncio.get_running_loop()
+                with open(file_path, "rb") as f:
+                    # No drain here, sendfile and the chunk loop both flush the header ahead of the body
+                    writer.write(header)
+                    try:
+                        # Zero-copy: the kernel moves file pages straight to the socket, no bytes pass through Python
+                        await loop.sendfile(writer.transport, f, 0, file_size, fallback=False)
+                    except (asyncio.SendfileNotAvailableError, NotImplementedError): # uvloop has no sendfile
+                        # Stream file content in chunks (e.g. event loops or platforms without os.sendfile)
+                        # Every block is read into the same preallocated buffer instead of a new bytes object
+                        buffer = bytearray(max(chunk_size, FALLBACK_BLOCK_SIZE))
+                        view = memoryview(buffer)
+                        # The transport may queue a view of buffer, so drain must wait until it is fully sent before reuse
+                        writer.transport.set_write_buffer_limits(high=0)
+                        # Disk reads run in a worker thread so a cold cache never stalls the event loop,
+                        # one read per block keeps the thread handoff and the drain off the per-chunk path
+                        # Stop at the size announced in the header even if the file has grown since startup
+                        remaining = file_size
+                        while remaining and (n := await asyncio.to_thread(f.readinto, view[:min(len(buffer), remaining)])):
+                            remaining -= n
+                            block = view[:n]
+                            for start in range(0, n, chunk_size):
+                                writer.write(block[start:start + chunk_size])
+                            await writer.drain()
+
+            if hasattr(socket, "TCP_CORK"):
+                client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 0)  # Flush the last partial segment
+            # %-style arguments are only formatted when a handler actually emits the record
+            logging.info("Server sent %d bytes to %s", file_size, writer.get_extra_info('peername'))
         except Exception as e:
-            logging.error(f"Server error: {e}")
+            logging.error("Server error: %s", e)
         finally:
             writer.close()
             await writer.wait_closed()
 
 if __name__ == "__main__":
     # Setup logging
-    # Ensure 'logs/' directory exists
-    os.makedirs("logs", exist_ok=True)
-    # Setup logging to file and console
-    logging.basicConfig(level=logging.INFO, filename="logs/server.log", filemode="a",
-                        format="%(asctime)s - %(levelname)s - %(message)s")
-    logging.getLogger().addHandler(logging.StreamHandler(sys.stdout)) # Also logs to console
+    atexit.register(configure_logging().stop) # Flush queued records on exit
+    # Turn SIGTERM into a clean exit, so atexit flushes the log queue and run_workers stops its workers
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     
-    # Simple command line argument parsing and validation for host, port, chunk_size, file_path
-    if len(sys.argv) != 5 or sys.argv[1] in ('-h', '--help'): # Expecting 4 args: host, port, chunk_size, file_path
-        logging.warning("Usage: python server.py <host> <port> <chunk_size> <file_path>")
-        logging.warning("Example: python server.py localhost 9001 8192 data/frankenstein.txt")
+    # Simple command line argument parsing and validation for host, port, chunk_size, file_path, [workers]
+    if len(sys.argv) not in (5, 6) or sys.argv[1] in ('-h', '--help'): # Expecting 4 args plus optional workers
+        logging.warning("Usage: python server.py <host> <port> <chunk_size> <file_path> [workers]")
+        logging.warning("Example: python server.py localhost 9001 65536 data/frankenstein.txt")
         sys.exit(1)
     elif sys.argv[2].isalpha() or sys.argv[3].isalpha(): # Check if port and chunk_size are integers
         logging.error("Error: Port and chunk_size must be integers")
         sys.exit(1)
+    elif len(sys.argv) == 6 and (not sys.argv[5].isdigit() or int(sys.argv[5]) < 1): # Check workers
+        logging.error("Error: workers must be a positive integer")
+        sys.exit(1)
 
 
     host = sys.argv[1]
     port = int(sys.argv[2])
     chunk_size = int(sys.argv[3])
     file_path = sys.argv[4]
+    workers = int(sys.argv[5]) if len(sys.argv) == 6 else 1
 
     server = TxtServer()
-    asyncio.run(server.startup_server(host, port, chunk_size, file_path))
\ No newline at end of file
+    if workers > 1:
+        sys.exit(server.run_workers(host, port, chunk_size, file_path, workers))
+    run_event_loop(server.startup_server(host, port, chunk_size, file_path), prefer_uvloop(file_path, chunk_size))
\ No newline at end of file
@@ -1,18 +1,79 @@
 from client import TxtClient
+import client as client_module
+from server import TxtServer, prefer_uvloop, uvloop, configure_logging
 from collections import Counter
 import pytest
+import asyncio
 import subprocess
 import time
 import os
 import socket
 import sys
+import re
+import logging
+from contextlib import contextmanager
+
+# Server commands: plain CPython for tests that only check validation, coverage for the ones serving data
+SERVER_CMD = [sys.executable, "server.py"]
+SERVER_CMD_COV = [sys.executable, "-m", "coverage", "run", "--parallel-mode", "server.py"]
+
+# Environment for coverage in subprocesses, built once at import rather than copied per server start
+COVERAGE_ENV = {**os.environ, 'COVERAGE_PROCESS_START': '.coveragerc', 'PYTHONPATH': os.getcwd()}
 
 def get_coverage_env():
     """Get environment variables for coverage in subprocesses"""
-    env = os.environ.copy()
-    env['COVERAGE_PROCESS_START'] = '.coveragerc'
-    env['PYTHONPATH'] = os.getcwd()
-    return env
+    return COVERAGE_ENV
+
+def free_port():
+    """Find an available port for testing"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('', 0))
+        return s.getsockname()[1]
+
+def wait_for_port(host, port, timeout=5.0):
+    """Poll until a server accepts connections on host:port instead of sleeping a fixed time"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.05):
+                return
+        except OSError:
+            time.sleep(0.01)
+    raise TimeoutError(f"Server on {host}:{port} did not start within {timeout}s")
+
+@contextmanager
+def running_server(host, port, chunk_size, file_path, *args, cmd=SERVER_CMD_COV):
+    """Start a server subprocess, wait until it accepts connections and terminate it on exit"""
+    coverage = cmd is SERVER_CMD_COV
+    output = None if coverage else subprocess.DEVNULL  # Coverage runs keep the server log on the console
+    server_process = subprocess.Popen([
+        *cmd, host, str(port), str(chunk_size), str(file_path), *args
+    ], env=get_coverage_env() if coverage else None, stdout=output, stderr=output)
+    try:
+        wait_for_port(host, port)
+        yield server_process
+    finally:
+        server_process.terminate()
+        try:
+            server_process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            server_process.kill()
+            server_process.wait()
+            raise
+
+def server_exit_code(*args, timeout=5):
+    """Run server.py with args, expecting it to exit on its own, and return its exit code"""
+    try:
+        result = subprocess.run([*SERVER_CMD, *map(str, args)],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        pytest.fail(f"Server did not exit within {timeout}s with arguments {args}")
+    return result.returncode
+
+@pytest.fixture(scope="module")
+def client():
+    """Fixture to provide one client shared by the text processing tests"""
+    return TxtClient()
 
 @pytest.mark.parametrize("text,expected", [
     ("hello world hello test", Counter({'hello': 2, 'world': 1, 'test': 1})),
@@ -21,13 +82,15 @@ def get_coverage_env():
     ("héllo wörld tëst résumé", Counter({'héllo': 1, 'wörld': 1, 'tëst': 1, 'résumé': 1})),
     ("hello café world naïve", Counter({'hello': 1, 'café': 1, 'world': 1, 'naïve': 1})),
     ("München München", Counter({'münchen': 2})),  # Fixed: should be lowercase
+    ("cafe\u0301 café Straße STRASSE", Counter({'café': 2, 'strasse': 2})),
+    ("Μαΐου πρωτεΐνη ǰob", Counter({'μαΐου': 1, 'πρωτεΐνη': 1, 'ǰob': 1})),
+    ("don't stop_here, now", Counter({'don': 1, 't': 1, 'stop_here': 1, 'now': 1})),
+    ("  \n\t ", Counter()),
     ("Vysoké tatry sú krásné", Counter({'vysoké': 1, 'tatry': 1, 'sú': 1, 'krásné': 1})),  # Fixed: should be lowercase
     ("Praha je hlavní město a současně největší město Česka.", Counter({'praha': 1, 'je': 1, 'hlavní': 1, 'město': 2, 'a': 1, 'současně': 1, 'největší': 1, 'česka': 1}))  # Fixed: should be lowercase
 ])
-def test_client_text_processing(text, expected):
+def test_client_text_processing(client, text, expected):
     """Test client text processing functions with various inputs"""
-    client = TxtClient()
-    
     # Test basic text processing
     result = client.process_text_chunk(text)
     assert result == expected
@@ -39,10 +102,8 @@ def test_client_text_processing(text, expected):
     ("café naïve incomplete", Counter({'café': 1, 'naïve': 1}), "incomplete"),
     ("", Counter(), "")
 ])
-def test_client_buffer_processing(text, expected_buffer, expected_incomplete):
+def test_client_buffer_processing(client, text, expected_buffer, expected_incomplete):
     """Test client buffer processing and incomplete word extraction"""
-    client = TxtClient()
-    
     # Test buffer processing (should only process complete words)
     result = client.process_buffer(text)
     assert result == expected_buffer
@@ -51,10 +112,42 @@ def test_client_buffer_processing(text, expected_buffer, expected_incomplete):
     incomplete = client.get_incomplete_word(text)
     assert incomplete == expected_incomplete
 
-def test_client_utf8_handling():
+@pytest.mark.parametrize("text,expected", [
+    ("hello world incomplete", ("hello world", "incomplete")),
+    ("line one\nline", ("line one", "line")),
+    ("tab\tseparated\r\nwords", ("tab\tseparated", "words")),
+    ("ends on a boundary ", ("ends on a boundary ", "")),
+    (" leading", ("", "leading")),
+    ("single", ("", "single")),
+    ("", ("", "")),
+    (b"caf\xc3\xa9 na\xc3\xafve", (b"caf\xc3\xa9", b"na\xc3\xafve")),
+    (bytearray(b"bytes tail"), (bytearray(b"bytes"), bytearray(b"tail")))
+])
+def test_client_split_at_last_boundary(client, text, expected):
+    """Test client splits a buffer once at its last word boundary"""
+    assert client.split_at_last_boundary(text) == expected
+
+def test_client_text_processing_into_counter(client):
+    """Test client adds words to an existing counter in place"""
+    counter = Counter({'hello': 1})
+
+    result = client.process_text_chunk("hello café world", counter)
+    assert result is counter
+    assert counter == Counter({'hello': 2, 'café': 1, 'world': 1})
+
+def test_client_word_pattern_compiled_once(client, monkeypatch):
+    """Test client tokenizes with the pattern compiled at import instead of building one per chunk"""
+    def fail(*args, **kwargs):
+        raise AssertionError("word pattern built during text processing")
+    monkeypatch.setattr(re, "compile", fail)
+    monkeypatch.setattr(re, "findall", fail)
+
+    # Longer than the small text fast path, so the regex runs
+    result = client.process_text_chunk("naïve stop_here 42 " * 10)
+    assert result == Counter({'naïve': 10, 'stop_here': 10, '42': 10})
+
+def test_client_utf8_handling(client):
     """Test client handles UTF-8 characters correctly"""
-    client = TxtClient()
-    
     # Test with accented characters
     result = client.process_text_chunk("café café naïve façade")
     expected = Counter({'café': 2, 'naïve': 1, 'façade': 1})
@@ -70,8 +163,20 @@ def test_client_utf8_handling():
     expected = Counter({'hello': 1, 'café': 1, 'world': 1, 'naïve': 1})
     assert result == expected
 
+def test_client_aggregate_results(client):
+    """Test client merges per-server counters without modifying them"""
+    small = Counter({'café': 1, 'test': 2})
+    large = Counter({'test': 1, 'this': 3, 'is': 3})
+
+    result = client.aggregate_results([small, large])
+    assert result == Counter({'test': 3, 'this': 3, 'is': 3, 'café': 1})
+    assert large == Counter({'test': 1, 'this': 3, 'is': 3})
+    assert client.aggregate_results([]) == Counter()
+    # The same result object passed twice counts twice
+    assert client.aggregate_results([small, small]) == Counter({'café': 2, 'test': 4})
+
 # Fixtures for server setup
-@pytest.fixture
+@pytest.fixture(scope="module")
 def host():
     """Fixture to provide the server host"""
     return "localhost"
@@ -80,32 +185,20 @@ def host():
 @pytest.fixture
 def available_port():
     """Find an available port for testing"""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind(('', 0))
-        return s.getsockname()[1]
+    return free_port()
     
-@pytest.fixture
+@pytest.fixture(scope="module")
 def chunk_size():
     """Fixture to provide the default chunk size"""
     return 1024
 
-#server creation fixture
-@pytest.fixture
-def start_server(host, available_port, chunk_size):
+#server creation fixture, started once per module and shared by the tests that use it
+@pytest.fixture(scope="module")
+def start_server(host, chunk_size):
     """Fixture to start server process with coverage"""
-    sample_file = "data/test.txt"
-    env = get_coverage_env()
-    server_process = subprocess.Popen([
-        sys.executable, "-m", "coverage", "run", "--parallel-mode", "server.py",
-        host, str(available_port), str(chunk_size), str(sample_file)
-    ], cwd=os.getcwd(), env=env)
-    time.sleep(1)   # Give server time to start
-    yield host, available_port, chunk_size  # Yield the host, port, and chunk size for the test to use
-
-    # Cleanup: terminate the server process
-    server_process.terminate()
-    server_process.wait()
-    time.sleep(0.5)
+    port = free_port()
+    with running_server(host, port, chunk_size, "data/test.txt"):
+        yield host, port, chunk_size  # Yield the host, port, and chunk size for the test to use
 
 @pytest.mark.asyncio
 async def test_real_client_server_interaction(start_server):
@@ -122,33 +215,15 @@ async def test_real_client_server_interaction(start_server):
 async def test_multi_server_interaction():
     """Tests client interaction with 2 servers on different ports"""
     # Get two different available ports
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s1:
-        s1.bind(('', 0))
-        port1 = s1.getsockname()[1]
-    
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s2:
-        s2.bind(('', 0))
-        port2 = s2.getsockname()[1]
+    port1 = free_port()
+    port2 = free_port()
     
     host = "localhost"
     chunk_size = 1024
     sample_file = "data/test.txt"
-    env = get_coverage_env()
     
     # Start two server processes on different ports
-    server_process1 = subprocess.Popen([
-        sys.executable, "-m", "coverage", "run", "--parallel-mode", "server.py",
-        host, str(port1), str(chunk_size), str(sample_file)
-    ], cwd=os.getcwd(), env=env)
-    
-    server_process2 = subprocess.Popen([
-        sys.executable, "-m", "coverage", "run", "--parallel-mode", "server.py",
-        host, str(port2), str(chunk_size), str(sample_file)
-    ], cwd=os.getcwd(), env=env)
-    
-    try:
-        time.sleep(1)  # Give servers time to start
-        
+    with running_server(host, port1, chunk_size, sample_file), running_server(host, port2, chunk_size, sample_file):
         client = TxtClient()
         servers = [(host, port1, chunk_size), (host, port2, chunk_size)]
         results = await client.run_analysis(servers)
@@ -157,40 +232,22 @@ async def test_multi_server_interaction():
         # Since we're connecting to two servers with the same file, we get double the counts
         expected = Counter({'test': 8, 'this': 6, 'is': 6, 'a': 6, 'txt': 2})
         assert aggregation_counter == expected
-        
-    finally:
-        # Cleanup: terminate both server processes
-        server_process1.terminate()
-        server_process2.terminate()
-        server_process1.wait()
-        server_process2.wait()
-        time.sleep(0.5)
-
-@pytest.fixture(params=[64, 128, 256, 512, 2048, 4096, 8192])
+
+@pytest.fixture(scope="module", params=[64, 128, 256, 512, 2048, 4096, 8192, 65536, 262144])
 def valid_chunk_size(request):
-    """Fixture to provide valid chunk sizes (64-8192)"""
+    """Fixture to provide valid chunk sizes (64-262144)"""
     return request.param
 
-@pytest.fixture
-def valid_chunk_server(host, available_port, valid_chunk_size):
-    """Fixture to start server with valid chunk size"""
-    sample_file = "data/test.txt"
-    env = get_coverage_env()
-    server_process = subprocess.Popen([
-        sys.executable, "-m", "coverage", "run", "--parallel-mode", "server.py",
-        host, str(available_port), str(valid_chunk_size), str(sample_file)
-    ], cwd=os.getcwd(), env=env)
-    time.sleep(1)   # Give server time to start
-    yield host, available_port, valid_chunk_size
-
-    # Cleanup: terminate the server process
-    server_process.terminate()
-    server_process.wait()
-    time.sleep(0.5)
+@pytest.fixture(scope="module")
+def valid_chunk_server(host, valid_chunk_size):
+    """Fixture to start server with valid chunk size, one server per chunk size"""
+    port = free_port()
+    with running_server(host, port, valid_chunk_size, "data/test.txt"):
+        yield host, port, valid_chunk_size
 
 @pytest.mark.asyncio
 async def test_valid_chunk_sizes(valid_chunk_server):
-    """Tests client interaction with valid chunk sizes (64-8192)"""
+    """Tests client interaction with valid chunk sizes (64-262144)"""
     addr, available_port, chunk_size = valid_chunk_server
     client = TxtClient()
     servers = [(addr, available_port, chunk_size)]
@@ -200,37 +257,19 @@ async def test_valid_chunk_sizes(valid_chunk_server):
     assert aggregation_counter == expected
 
 # chunk size tests - invalid range (should fail)
-@pytest.fixture(params=[0, 1, 16, 32, 63, 16384, 32768, 9999999])
+@pytest.fixture(params=[0, 1, 16, 32, 63, 262145, 524288, 9999999])
 def invalid_chunk_size(request):
-    """Fixture to provide invalid chunk sizes (outside 64-8192 range)"""
+    """Fixture to provide invalid chunk sizes (outside 64-262144 range)"""
     return request.param
 
 @pytest.mark.asyncio
 async def test_invalid_chunk_sizes_fail(host, available_port, invalid_chunk_size):
     """Tests that server rejects invalid chunk sizes"""
     sample_file = "data/test.txt"
-    env = get_coverage_env()
-    
-    # This should fail - server should exit with non-zero code
-    with pytest.raises(subprocess.CalledProcessError):
-        result = subprocess.run([
-            sys.executable, "-m", "coverage", "run", "--parallel-mode", "server.py",
-            host, str(available_port), str(invalid_chunk_size), str(sample_file)
-        ], cwd=os.getcwd(), env=env, check=True, capture_output=True, timeout=5)
-    
-    # Alternative: Check that server process exits quickly with error
-    server_process = subprocess.Popen([
-        sys.executable, "-m", "coverage", "run", "--parallel-mode", "server.py",
-        host, str(available_port), str(invalid_chunk_size), str(sample_file)
-    ], cwd=os.getcwd(), env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     
-    try:
-        # Server should exit quickly due to validation error
-        return_code = server_process.wait(timeout=3)
-        assert return_code != 0, f"Server should have failed with invalid chunk_size {invalid_chunk_size}"
-    except subprocess.TimeoutExpired:
-        server_process.kill()
-        pytest.fail(f"Server did not exit quickly with invalid chunk_size {invalid_chunk_size}")
+    # This should fail - server should exit quickly with non-zero code due to validation error
+    return_code = server_exit_code(host, available_port, invalid_chunk_size, sample_file)
+    assert return_code != 0, f"Server should have failed with invalid chunk_size {invalid_chunk_size}"
 
 #valid port tests
 @pytest.fixture(params=[2100,4286, 5563, 4200, 9000, 25565, 65000])
@@ -243,22 +282,22 @@ def test_valid_ports(valid_port):
     host = "localhost"
     chunk_size = 1024
     sample_file = "data/test.txt"
-    env = get_coverage_env()
     
+    # Fixed ports may belong to another service, whose listener wait_for_port would mistake for ours
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # Only an active listener makes bind fail
+        try:
+            probe.bind(('', valid_port))
+        except OSError:
+            pytest.skip(f"Port {valid_port} is already in use")
+
     # This should succeed - server should start and then be terminated
-    server_process = subprocess.Popen([
-        sys.executable, "-m", "coverage", "run", "--parallel-mode", "server.py",
-        host, str(valid_port), str(chunk_size), str(sample_file)
-    ], cwd=os.getcwd(), env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    
-    try:
-        time.sleep(2)  # Give server time to start
+    with running_server(host, valid_port, chunk_size, sample_file, cmd=SERVER_CMD) as server_process:
         # Check if the server is still running
         assert server_process.poll() is None, f"Server should be running on valid port {valid_port}"
-    finally:
-        server_process.terminate()
-        server_process.wait()
-        time.sleep(0.5)
+        # The listener is ours if it announces the size of the served file
+        with socket.create_connection((host, valid_port), timeout=5) as s, s.makefile("rb") as stream:
+            assert stream.readline() == f"{os.path.getsize(sample_file)}\n".encode()
 
 # invalid port tests
 @pytest.fixture(params=[-1, 0, 65536, 70000, 80000])
@@ -270,25 +309,142 @@ def invalid_port(request):
 async def test_invalid_ports_fail(host, invalid_port, chunk_size):
     """Tests that server rejects invalid port numbers"""
     sample_file = "data/test.txt"
-    env = get_coverage_env()
-    
-    # This should fail - server should exit with non-zero code
-    with pytest.raises(subprocess.CalledProcessError):
-        result = subprocess.run([
-            sys.executable, "-m", "coverage", "run", "--parallel-mode", "server.py",
-            host, str(invalid_port), str(chunk_size), str(sample_file)
-        ], cwd=os.getcwd(), env=env, check=True, capture_output=True, timeout=5)
-    
-    # Alternative: Check that server process exits quickly with error
-    server_process = subprocess.Popen([
-        sys.executable, "-m", "coverage", "run", "--parallel-mode", "server.py",
-        host, str(invalid_port), str(chunk_size), str(sample_file)
-    ], cwd=os.getcwd(), env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     
+    # This should fail - server should exit quickly with non-zero code due to validation error
+    return_code = server_exit_code(host, invalid_port, chunk_size, sample_file)
+    assert return_code != 0, f"Server should have failed with invalid port {invalid_port}"
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_matches_inline(tmp_path, host, available_port):
+    """Tests that tokenizing windows in worker processes gives the same counts as inline tokenizing"""
+    sample_file = tmp_path / "large.txt"
+    sample_file.write_text("this is a test\nof the worker pool " * 100000)  # ~3.4 MB, several pool windows
+    with running_server(host, available_port, 8192, sample_file):
+        servers = [(host, available_port, 8192)]
+        pooled_client = TxtClient(workers=2)
+        pooled = pooled_client.aggregate_results(await pooled_client.run_analysis(servers))
+        inline_client = TxtClient(workers=0)
+        inline = inline_client.aggregate_results(await inline_client.run_analysis(servers))
+        assert pooled == inline
+        assert pooled['test'] == 100000
+
+@pytest.mark.parametrize("cpu_count", [None, 1])
+def test_client_single_cpu_tokenizes_inline(monkeypatch, cpu_count):
+    """Tests that the client does not start a worker pool when there is no second CPU to run it on"""
+    monkeypatch.setattr(os, "cpu_count", lambda: cpu_count)
+    assert TxtClient().workers == 0
+
+@pytest.mark.asyncio
+async def test_multibyte_characters_across_chunks(monkeypatch, tmp_path, host, available_port):
+    """Tests that UTF-8 characters split across chunk and window boundaries are counted correctly"""
+    # A small odd window splits the ~145 KB payload mid-stream many times, often inside a multi-byte character
+    monkeypatch.setattr(client_module, "_WINDOW_SIZE", 1001)
+    sample_file = tmp_path / "unicode.txt"
+    sample_file.write_text("café naïve město München " * 5000, encoding="utf-8")
+    with running_server(host, available_port, 64, sample_file):
+        client = TxtClient(workers=0)
+        results = await client.run_analysis([(host, available_port, 64)])
+        expected = Counter({'café': 5000, 'naïve': 5000, 'město': 5000, 'münchen': 5000})
+        assert client.aggregate_results(results) == expected
+
+@pytest.mark.asyncio
+async def test_server_chunked_fallback(monkeypatch, tmp_path):
+    """Tests that the server streams the file in chunks when sendfile is not available"""
+    sample_file = tmp_path / "fallback.txt"
+    sample_file.write_text("this is a test\n" * 100000)  # ~1.5 MB, spans more than one read block
+
+    async def sendfile_not_available(*args, **kwargs):
+        raise asyncio.SendfileNotAvailableError("sendfile disabled for this test")
+    monkeypatch.setattr(asyncio.get_running_loop(), "sendfile", sendfile_not_available)
+
+    txt_server = await asyncio.start_server(
+        lambda r, w: TxtServer().handle_client(r, w, str(sample_file), 64),
+        "localhost", 0
+    )
     try:
-        # Server should exit quickly due to validation error
-        return_code = server_process.wait(timeout=3)
-        assert return_code != 0, f"Server should have failed with invalid port {invalid_port}"
-    except subprocess.TimeoutExpired:
-        server_process.kill()
-        pytest.fail(f"Server did not exit quickly with invalid port {invalid_port}")
\ No newline at end of file
+        port = txt_server.sockets[0].getsockname()[1]
+        result = await TxtClient(workers=0).read_from_server("localhost", port, 64)
+        assert result == Counter({'this': 100000, 'is': 100000, 'a': 100000, 'test': 100000})
+    finally:
+        txt_server.close()
+        await txt_server.wait_closed()
+
+@pytest.mark.asyncio
+async def test_server_chunked_fallback_stops_at_file_size(monkeypatch, tmp_path):
+    """Tests that the chunked fallback sends no more than the announced size when the file has grown"""
+    sample_file = tmp_path / "growing.txt"
+    sample_file.write_text("this is a test\n" * 1000)
+    file_size = sample_file.stat().st_size
+    with open(sample_file, "a") as f:
+        f.write("appended after startup\n" * 1000)
+
+    async def sendfile_not_available(*args, **kwargs):
+        raise asyncio.SendfileNotAvailableError("sendfile disabled for this test")
+    monkeypatch.setattr(asyncio.get_running_loop(), "sendfile", sendfile_not_available)
+
+    txt_server = await asyncio.start_server(
+        lambda r, w: TxtServer().handle_client(r, w, str(sample_file), 64, file_size),
+        "localhost", 0
+    )
+    try:
+        port = txt_server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("localhost", port)
+        assert int(await reader.readuntil(b"\n")) == file_size
+        assert len(await reader.read()) == file_size
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        txt_server.close()
+        await txt_server.wait_closed()
+
+def test_configure_logging_after_stop():
+    """Tests that configure_logging starts a new listener once the cached one has been stopped"""
+    root_logger = logging.getLogger()
+    saved_handlers, saved_level = root_logger.handlers[:], root_logger.level
+    try:
+        listener = configure_logging()
+        assert configure_logging() is listener  # Running listener is reused
+        listener.stop()
+        restarted = configure_logging()
+        assert restarted is not listener
+        restarted.stop()
+    finally:
+        root_logger.handlers[:] = saved_handlers
+        root_logger.setLevel(saved_level)
+
+def test_prefer_uvloop_only_without_sendfile(tmp_path):
+    """Tests that uvloop, which has no sendfile, is only chosen for files sent in a single write"""
+    sample_file = tmp_path / "sized.txt"
+    sample_file.write_text("word " * 100)  # 500 bytes
+    assert not prefer_uvloop(str(sample_file), 64)
+    assert prefer_uvloop(str(sample_file), 1024) == (uvloop is not None)
+
+@pytest.mark.asyncio
+async def test_multi_worker_server(host, available_port, chunk_size):
+    """Tests that a server started with several workers serves every connection and stops with its parent"""
+    with running_server(host, available_port, chunk_size, "data/test.txt", "2") as server_process:
+        client = TxtClient()
+        servers = [(host, available_port, chunk_size)] * 4
+        results = await client.run_analysis(servers)
+        assert client.aggregate_results(results) == Counter({'test': 16, 'this': 12, 'is': 12, 'a': 12, 'txt': 4})
+    assert server_process.returncode == 0
+
+    # Workers exit with the parent, so the port is free again
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        assert s.connect_ex((host, available_port)) != 0
+
+def test_port_in_use_fail(start_server):
+    """Tests that a single-process server does not share a port that is already in use"""
+    host, port, chunk_size = start_server
+    assert server_exit_code(host, port, chunk_size, "data/test.txt") != 0
+
+@pytest.mark.parametrize("workers", ["0", "-1", "two"])
+def test_invalid_workers_fail(host, available_port, chunk_size, workers):
+    """Tests that server rejects an invalid worker count"""
+    assert server_exit_code(host, available_port, chunk_size, "data/test.txt", workers) != 0
+
+@pytest.mark.parametrize("file_path", ["data/missing.txt", "data"])
+def test_invalid_file_path_fail(host, available_port, chunk_size, file_path):
+    """Tests that server rejects paths that are not regular files"""
+    assert server_exit_code(host, available_port, chunk_size, file_path) != 0